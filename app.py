@@ -1,26 +1,28 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import datetime
 from datetime import timedelta
-import requests
-from bs4 import BeautifulSoup
 import numpy as np
 import time
+import random
 import re
+import os
+from html import escape
+import asyncio
+from dataclasses import dataclass
+from collections import namedtuple
+import hashlib
+import functools
+import diskcache
 
-# App configuration
-st.set_page_config(
-    page_title="PUT Credit Spread Builder",
-    page_icon="📈",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Ticker shown on first load (override with the DEFAULT_TICKER environment variable)
+DEFAULT_TICKER = os.environ.get("DEFAULT_TICKER", "SPY")
+
+# History window loaded for the selected ticker; every bundle call passes it so they share one cache entry
+HISTORY_PERIOD = "1mo"
 
-# Custom CSS
-st.markdown("""
+# Custom CSS injected at the top of the page
+CSS_BLOB = """
 <style>
     .main-header {font-size: 2.5rem; color: #1f77b4; font-weight: 700;}
     .section-header {font-size: 1.8rem; color: #1f77b4; border-bottom: 2px solid #1f77b4; padding-bottom: 0.3rem;}
@@ -34,7 +36,69 @@ st.markdown("""
     .put-spread {background-color: #f9f9f9; padding: 15px; border-radius: 10px; border: 1px solid #ddd; margin: 10px 0;}
     .metric-card {background-color: #f8f9fa; padding: 10px; border-radius: 5px; margin: 5px 0;}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Function to open the persistent on-disk cache once per process (shared across sessions and restarts)
+@st.cache_resource(show_spinner=False)
+def get_disk_cache():
+    return diskcache.Cache(".cache")
+
+# Resolved on the script thread so the fetchers' worker threads never touch st.* (reruns get the same handle)
+cache = get_disk_cache()
+
+# Cache lifetimes tuned to how often each kind of data actually changes
+# (history's last bar is the current price, so it can't outlive the hourly in-memory caches on load_ticker_bundle/get_stock_data)
+HISTORY_TTL = 3600
+NEWS_TTL = 15 * 60
+EARNINGS_TTL = 7 * 24 * 3600
+# stock.info carries P/E, P/B, yield and beta alongside the static profile, so it ages like prices do
+INFO_TTL = 3600
+
+# Decorator to cache a per-ticker fetcher on disk for ttl seconds (results matching skip are returned but not stored)
+def disk_cached(ttl, skip=None):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(stock, *args):
+            key = hashlib.md5(f"{fn.__name__}:{stock.ticker}:{':'.join(map(str, args))}".encode()).hexdigest()
+            record = cache.get(key)
+            if record is not None and time.time() - record['ts'] < ttl:
+                return record['data']
+            data = fn(stock, *args)
+            if skip is None or not skip(data):
+                cache.set(key, {'ts': time.time(), 'data': data}, expire=ttl)
+            return data
+        return wrapper
+    return decorator
+
+# Session state slot holding every session_cached result, so "Clear cache" can drop them in one go
+SESSION_CACHE_KEY = "_session_cache"
+
+# Decorator to memoize a small result in st.session_state for ttl seconds (cheaper than st.cache_data's pickling)
+def session_cached(ttl):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = (fn.__name__,) + args
+            store = st.session_state.setdefault(SESSION_CACHE_KEY, {})
+            record = store.get(key)
+            if record is not None and time.time() - record['ts'] < ttl:
+                return record['data']
+            data = fn(*args)
+            store[key] = {'ts': time.time(), 'data': data}
+            return data
+        return wrapper
+    return decorator
+
+# App configuration
+st.set_page_config(
+    page_title="PUT Credit Spread Builder",
+    page_icon="📈",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS (Streamlit drops elements that a rerun doesn't emit, so this must be sent on every run)
+st.markdown(CSS_BLOB, unsafe_allow_html=True)
 
 # App title
 st.markdown('<p class="main-header">📉 PUT Credit Spread Builder</p>', unsafe_allow_html=True)
@@ -43,15 +107,12 @@ st.markdown("Analyze stocks and build optimal PUT credit spread strategies with
 # Sidebar
 with st.sidebar:
     st.header("Configuration")
-    ticker = st.text_input("Stock Ticker", "SPY").upper()
-    dte = st.slider("Days to Expiration (DTE)", min_value=5, max_value=45, value=14)
-    capital = st.number_input("Capital Allocated ($)", min_value=100, value=1000, step=100)
-    max_risk_pct = st.slider("Max Risk % per Trade", min_value=1, max_value=10, value=3)
+    ticker = st.text_input("Stock Ticker", DEFAULT_TICKER).upper()
+    watchlist = st.text_input("Watchlist (comma-separated)", "").upper()
+    watchlist_tickers = tuple(t.strip() for t in watchlist.split(',') if t.strip())
     
     st.markdown("---")
-    st.markdown("### Strategy Parameters")
-    strike_distance = st.slider("Short Strike Distance (%)", min_value=1, max_value=10, value=5)
-    spread_width = st.slider("Spread Width (%)", min_value=1, max_value=10, value=5)
+    clear_cache = st.button("Clear cache")
     
     st.markdown("---")
     st.markdown("### How to Use")
@@ -67,8 +128,9 @@ with st.sidebar:
 @st.cache_data(ttl=3600)
 def get_company_profile(ticker):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = load_ticker_bundle(ticker, HISTORY_PERIOD).info
+        if isinstance(info, Exception):
+            raise info
         profile = {
             'name': info.get('longName', ticker),
             'sector': info.get('sector', 'N/A'),
@@ -84,8 +146,9 @@ def get_company_profile(ticker):
 @st.cache_data(ttl=3600)
 def get_financial_metrics(ticker):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = load_ticker_bundle(ticker, HISTORY_PERIOD).info
+        if isinstance(info, Exception):
+            raise info
         
         metrics = {
             'peRatio': info.get('trailingPE', 'N/A'),
@@ -96,93 +159,184 @@ def get_financial_metrics(ticker):
             'debtToEquity': info.get('debtToEquity', 'N/A')
         }
         
-        # Get financials
-        financials = stock.financials
-        if not financials.empty:
-            try:
-                revenue = financials.loc['Total Revenue'].iloc[0] if 'Total Revenue' in financials.index else 'N/A'
-                net_income = financials.loc['Net Income'].iloc[0] if 'Net Income' in financials.index else 'N/A'
-                metrics['revenue'] = revenue
-                metrics['netIncome'] = net_income
-            except:
-                metrics['revenue'] = 'N/A'
-                metrics['netIncome'] = 'N/A'
-        
         return metrics
     except:
         return {
             'peRatio': 'N/A', 'pbRatio': 'N/A', 'profitMargin': 'N/A',
-            'dividendYield': 'N/A', 'beta': 'N/A', 'debtToEquity': 'N/A',
-            'revenue': 'N/A', 'netIncome': 'N/A'
+            'dividendYield': 'N/A', 'beta': 'N/A', 'debtToEquity': 'N/A'
         }
 
+# Browser User-Agent sent by the scraping fallbacks
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Function to get a shared HTTP session for the scraping fallbacks, so repeat calls reuse the pooled connection
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    import requests
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+# Google Finance / Google News fallback pages and the elements read from them
+GFIN_URL = "https://www.google.com/finance/quote/{}"
+GNEWS_URL = "https://www.google.com/search?q={}+stock+news&tbm=nws"
+GNEWS_ITEM_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' SoaBEf ')]"
+GNEWS_TITLE_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' n0jPhd ')]"
+GNEWS_PUBLISHER_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' MgUUmf ')]"
+
+# Price element on a Google Finance quote page
+GFIN_PRICE_RE = re.compile(rb'class="YMlKec fxKbKc"[^>]*>\s*\$?([\d,]+(?:\.\d+)?)')
+
 # Function to fetch stock data from alternative sources if yfinance fails
 def fetch_stock_data_alternative(ticker):
     try:
         # Try to get data from Google Finance
-        url = f"https://www.google.com/finance/quote/{ticker}"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        url = GFIN_URL.format(ticker)
+        response = get_http_session().get(url, timeout=10)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            price_text = soup.find('div', class_='YMlKec fxKbKc')
-            if price_text:
-                price = float(price_text.text.strip().replace('$', '').replace(',', ''))
+            # Only one value is needed, so match it directly instead of parsing the whole page
+            match = GFIN_PRICE_RE.search(response.content)
+            if match:
+                price = float(match.group(1).replace(b',', b''))
                 
                 # Create mock historical data
                 dates = pd.date_range(end=datetime.datetime.now(), periods=30, freq='D')
-                prices = [price * (1 + np.random.normal(0, 0.02)) for _ in range(30)]
+                rng = np.random.default_rng()
+                prices = price * (1 + rng.normal(0, 0.02, 30))
                 
-                hist = pd.DataFrame({
-                    'Open': prices,
-                    'High': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices],
-                    'Low': [p * (1 - abs(np.random.normal(0, 0.01))) for p in prices],
-                    'Close': prices,
-                    'Volume': [np.random.randint(1000000, 5000000) for _ in range(30)]
-                }, index=dates)
+                # Fill one float32 OHLC block so the frame matches fetch_history's columns and dtype without per-column copies
+                arr = np.empty((30, 4), dtype=np.float32)
+                arr[:, 0] = prices
+                arr[:, 1] = prices * (1 + np.abs(rng.normal(0, 0.01, 30)))
+                arr[:, 2] = prices * (1 - np.abs(rng.normal(0, 0.01, 30)))
+                arr[:, 3] = prices
+                hist = pd.DataFrame(arr, columns=['Open', 'High', 'Low', 'Close'], index=dates)
                 
-                info = {"shortName": ticker, "regularMarketPrice": price}
-                return hist, info
+                return hist
     except Exception as e:
         st.warning(f"Alternative data source also failed: {str(e)}")
     
-    return None, None
+    return None
+
+# Raw yfinance results for one ticker; each field holds the fetched value or the exception raised fetching it
+@dataclass(frozen=True)
+class TickerBundle:
+    hist: object
+    info: object
+    earnings_dates: object
+    news: object
+
+# Functions to fetch the individual Yahoo endpoints (run on worker threads, so no st.* calls here)
+# An empty frame usually means a throttled response, so don't pin it (and the mock fallback) to disk
+@disk_cached(HISTORY_TTL, skip=lambda hist: hist.empty)
+def fetch_history(stock, period):
+    # Skip the dividend/split join and adjustment pass; only raw OHLC is used
+    hist = stock.history(period=period, actions=False, auto_adjust=False, prepost=False)
+    if hist.empty:
+        return hist
+    # Prices don't need float64 precision; float32 halves the bytes cached and sent to the chart
+    return hist[['Open', 'High', 'Low', 'Close']].astype(np.float32)
+
+# A throttled quote comes back empty or without the profile fields; don't keep that for the whole TTL
+@disk_cached(INFO_TTL, skip=lambda info: not info or 'longName' not in info)
+def fetch_info(stock):
+    return stock.info
+
+# Likewise None or an empty frame, which would otherwise show estimated earnings for a week
+@disk_cached(EARNINGS_TTL, skip=lambda dates: dates is None or dates.empty)
+def fetch_earnings(stock):
+    return stock.earnings_dates
+
+@disk_cached(NEWS_TTL)
+def fetch_news(stock):
+    return stock.news
+
+# Function to fetch all Yahoo endpoints for a ticker concurrently
+async def fetch_all(ticker, period):
+    import yfinance as yf
+    semaphore = asyncio.Semaphore(4)
+    
+    # yf.Ticker fills its lazy caches without locks, so each worker builds its own rather than sharing one
+    def fetch(fetcher, *args):
+        return fetcher(yf.Ticker(ticker), *args)
+    
+    async def run(fetcher, *args):
+        async with semaphore:
+            return await asyncio.to_thread(fetch, fetcher, *args)
+    
+    tasks = [
+        run(fetch_history, period),
+        run(fetch_info),
+        run(fetch_earnings),
+        run(fetch_news)
+    ]
+    hist, info, earnings_dates, news = await asyncio.gather(*tasks, return_exceptions=True)
+    return TickerBundle(hist=hist, info=info, earnings_dates=earnings_dates, news=news)
+
+# Function to load the ticker bundle once per ticker (cached by reference, treat as read-only)
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_ticker_bundle(ticker, period):
+    return asyncio.run(fetch_all(ticker, period))
 
 # Function to get stock data with enhanced error handling
-@st.cache_data(ttl=3600)
-def get_stock_data(ticker, period="1mo"):
-    try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period)
-        
-        # Check if we got valid data
-        if hist.empty:
-            st.warning(f"No historical data found for {ticker} in yfinance. Trying alternative sources...")
-            return fetch_stock_data_alternative(ticker)
-            
-        # Try to get info with retry logic
-        max_retries = 3
-        info = {}
-        for attempt in range(max_retries):
-            try:
-                info = stock.info
-                if info:
-                    break
-            except:
-                if attempt == max_retries - 1:
-                    st.warning(f"Could not fetch detailed info for {ticker}, using minimal data")
-                    info = {"shortName": ticker, "regularMarketPrice": hist['Close'].iloc[-1]}
-                time.sleep(1)  # Wait before retrying
-                
-        return hist, info
-    except Exception as e:
-        st.error(f"Error fetching data for {ticker} from yfinance: {str(e)}")
+# (cached by reference to skip pickling the frame on every hit; callers must treat it as read-only)
+@st.cache_resource(ttl=3600)
+def get_stock_data(ticker, period=HISTORY_PERIOD):
+    bundle = load_ticker_bundle(ticker, period)
+    hist = bundle.hist
+    
+    if isinstance(hist, Exception):
+        st.error(f"Error fetching data for {ticker} from yfinance: {str(hist)}")
+        return fetch_stock_data_alternative(ticker)
+    
+    # Check if we got valid data
+    if hist.empty:
+        st.warning(f"No historical data found for {ticker} in yfinance. Trying alternative sources...")
         return fetch_stock_data_alternative(ticker)
+    
+    return hist
 
-# Function to get options chain data
-@st.cache_data(ttl=3600)
+# Function to batch-fetch history for several tickers in one request
+# (cached by reference to skip pickling the frame on every hit; callers must treat it as read-only)
+@st.cache_resource(ttl=3600, show_spinner=False)
+def get_bulk_history(tickers, period="1mo"):
+    import yfinance as yf
+    data = yf.download(list(tickers), period=period, group_by='ticker', threads=True, progress=False)
+    # A single ticker comes back with flat columns; give it the same (ticker, field) layout
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    return data
+
+# Function to scan a watchlist for pivot levels in one vectorized pass
+def scan_watchlist(tickers):
+    data = get_bulk_history(tickers)
+    if data is None or data.empty:
+        return None
+    
+    # (n_tickers, n_bars) blocks; forward-fill so a missing last bar doesn't blank a ticker
+    highs = data.xs('High', axis=1, level=1).ffill().to_numpy().T
+    lows = data.xs('Low', axis=1, level=1).ffill().to_numpy().T
+    closes = data.xs('Close', axis=1, level=1).ffill().to_numpy().T
+    symbols = list(data.xs('Close', axis=1, level=1).columns)
+    
+    pivot, support1, support2, resistance1, resistance2 = compute_levels(highs, lows, closes)
+    last = closes[:, -1]
+    scan = pd.DataFrame({
+        'Price': last,
+        'Pivot': pivot,
+        'Support 1': support1,
+        'Support 2': support2,
+        'Resistance 1': resistance1,
+        'Resistance 2': resistance2,
+        'Distance to S1 (%)': (last - support1) / last * 100
+    }, index=symbols)
+    return scan.dropna()
+
+# Function to get options chain data (cached by reference; treat as read-only)
+@st.cache_resource(ttl=3600)
 def get_options_chain(ticker, expiration):
+    import yfinance as yf
     try:
         stock = yf.Ticker(ticker)
         options_chain = stock.option_chain(expiration)
@@ -192,18 +346,27 @@ def get_options_chain(ticker, expiration):
         return None
 
 # Function to get upcoming events
-def get_upcoming_events(ticker):
-    today = datetime.date.today()
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def get_upcoming_events(ticker, today):
     events = []
     
     # Try to get real earnings date if available
     try:
-        stock = yf.Ticker(ticker)
-        earnings_dates = stock.earnings_dates
+        earnings_dates = load_ticker_bundle(ticker, HISTORY_PERIOD).earnings_dates
+        if isinstance(earnings_dates, Exception):
+            raise earnings_dates
         if earnings_dates is not None and not earnings_dates.empty:
-            next_earnings = earnings_dates[earnings_dates.index > pd.Timestamp.today()]
-            if not next_earnings.empty:
-                next_earnings_date = next_earnings.index[0].date()
+            # Yahoo lists earnings newest first; reversing that is a view, so only sort when the order is mixed
+            dates_index = earnings_dates.index
+            if dates_index.is_monotonic_decreasing:
+                dates_index = dates_index[::-1]
+            elif not dates_index.is_monotonic_increasing:
+                dates_index = dates_index.sort_values()
+            # Cut off at the start of the caller's today so the result only changes when the cache key does
+            today_ts = pd.Timestamp(today).tz_localize(dates_index.tz)
+            pos = dates_index.searchsorted(today_ts, side='right')
+            if pos < len(dates_index):
+                next_earnings_date = dates_index[pos].date()
                 events.append({
                     'date': next_earnings_date,
                     'event': 'Earnings Release',
@@ -221,9 +384,9 @@ def get_upcoming_events(ticker):
             today + timedelta(days=35)
         ]
         
-        # Select one random earnings date for the mock data
-        import random
-        earnings_date = random.choice(potential_dates)
+        # Select one earnings date for the mock data, seeded per ticker so reruns stay stable
+        rng = random.Random(ticker)
+        earnings_date = rng.choice(potential_dates)
         events.append({
             'date': earnings_date,
             'event': 'Earnings Release (Estimated)',
@@ -251,34 +414,37 @@ def get_upcoming_events(ticker):
     
     # Sort events by date
     events.sort(key=lambda x: x['date'])
-    return events
+    
+    # Parallel arrays of days until each event and its importance code (1 = High) for vectorized scoring
+    event_days = np.fromiter((e['date'].toordinal() for e in events), dtype=np.int32, count=len(events)) - today.toordinal()
+    event_codes = np.fromiter((e['importance'] == 'High' for e in events), dtype=np.int8, count=len(events))
+    return events, event_days.astype(np.int16), event_codes
 
 # Function to get recent news with enhanced sources
-@st.cache_data(ttl=3600)
+@session_cached(NEWS_TTL)
 def get_news(ticker):
     # Try to get news from Yahoo Finance
     try:
-        stock = yf.Ticker(ticker)
-        news = stock.news
-        if news:
+        news = load_ticker_bundle(ticker, HISTORY_PERIOD).news
+        if news and not isinstance(news, Exception):
             return news[:5]  # Return top 5 news items
     except:
         pass
     
     # Fallback: Try to get news from Google News
     try:
-        url = f"https://www.google.com/search?q={ticker}+stock+news&tbm=nws"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        from lxml import html as lxml_html
+        url = GNEWS_URL.format(ticker)
+        response = get_http_session().get(url, timeout=10)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            news_items = soup.find_all('div', class_='SoaBEf', limit=5)
+            doc = lxml_html.fromstring(response.content)
+            news_items = doc.xpath(GNEWS_ITEM_XPATH)[:5]
             
             news = []
             for item in news_items:
-                title = item.find('div', class_='n0jPhd').text
-                publisher = item.find('div', class_='MgUUmf').text
+                title = item.xpath(GNEWS_TITLE_XPATH)[0].text_content()
+                publisher = item.xpath(GNEWS_PUBLISHER_XPATH)[0].text_content()
                 news.append({"title": title, "publisher": publisher})
             
             return news
@@ -292,34 +458,58 @@ def get_news(ticker):
         {"title": "Analysts maintain positive outlook on stock", "publisher": "Financial Times"}
     ]
 
+# Number of recent bars used for the pivot high/low (roughly one trading month)
+PIVOT_WINDOW = 20
+
+# Function to compute pivot levels along the last axis, so a (n_tickers, n_bars) block is scanned in one call
+def compute_levels(highs, lows, closes, window=PIVOT_WINDOW):
+    # Use only the recent window; levels from older ranges are stale for a short-dated spread
+    hi = highs[..., -window:].max(axis=-1)
+    lo = lows[..., -window:].min(axis=-1)
+    last = closes[..., -1]
+    
+    # Simple pivot point calculation
+    pivot = (hi + lo + last) / 3.0
+    rng = hi - lo
+    support1 = (2 * pivot) - hi
+    resistance1 = (2 * pivot) - lo
+    support2 = pivot - rng
+    resistance2 = pivot + rng
+    return pivot, support1, support2, resistance1, resistance2
+
+# Pivot point with two support and two resistance levels
+Levels = namedtuple('Levels', 'pivot s1 s2 r1 r2')
+
 # Function to calculate support/resistance levels
 def calculate_support_resistance(hist, num_levels=3):
     if hist is None or hist.empty:
-        return {'pivot': 0, 'support': [0, 0], 'resistance': [0, 0]}
-        
-    closes = hist['Close']
-    # Simple pivot point calculation
-    pivot = (hist['High'].max() + hist['Low'].min() + closes.iloc[-1]) / 3
-    support1 = (2 * pivot) - hist['High'].max()
-    resistance1 = (2 * pivot) - hist['Low'].min()
-    support2 = pivot - (hist['High'].max() - hist['Low'].min())
-    resistance2 = pivot + (hist['High'].max() - hist['Low'].min())
-    
-    return {
-        'pivot': pivot,
-        'support': [support1, support2],
-        'resistance': [resistance1, resistance2]
-    }
+        return Levels(0.0, 0.0, 0.0, 0.0, 0.0)
+    
+    # Take the recent bars as NumPy views of each column (no intermediate frame copy)
+    recent = hist.iloc[-PIVOT_WINDOW:]
+    pivot, support1, support2, resistance1, resistance2 = compute_levels(
+        recent['High'].to_numpy(), recent['Low'].to_numpy(), recent['Close'].to_numpy()
+    )
+    
+    return Levels(float(pivot), float(support1), float(support2), float(resistance1), float(resistance2))
 
 # Function to calculate IV percentile (mock for demo)
 def calculate_iv_percentile(ticker):
     # In a real app, you'd use options data
-    # Returning a random value for demonstration
-    import random
-    return random.randint(30, 80)
+    # Returning a random value for demonstration, seeded per ticker so reruns stay stable
+    rng = random.Random(ticker)
+    return rng.randint(30, 80)
+
+# Risk score lookup tables
+EVENT_WEIGHTS = np.array([[0, 20], [0, 40]], dtype=np.int16)  # [importance_code (1 = High), in_window]
+SUPPORT_WEIGHTS = np.array([30, 15, 0], dtype=np.int16)  # by support distance bucket: <2%, <5%, further
+SUPPORT_BINS = np.array([2, 5])
+IV_WEIGHTS = np.array([10, 0, -10], dtype=np.int16)  # by IV bucket: <30, 30-70, >70 (high IV is good for premium sellers)
+SUPPORT_REASONS = ["Close to support level (${:.2f})", "Moderately close to support level (${:.2f})", None]
+IV_REASONS = ["Low IV percentile means less premium", None, "High IV percentile good for option selling"]
 
 # Function to assess risk
-def assess_risk(events, dte, current_price, support_levels, iv_percentile):
+def assess_risk(events, event_days, event_codes, dte, current_price, support_levels, iv_percentile):
     if current_price == 0:
         return "High", 100, ["Invalid price data"]
         
@@ -327,31 +517,27 @@ def assess_risk(events, dte, current_price, support_levels, iv_percentile):
     reasons = []
     
     # Check for high-impact events within DTE
-    for event in events:
-        days_until_event = (event['date'] - datetime.date.today()).days
-        if 0 <= days_until_event <= dte:
-            risk_score += 40 if event['importance'] == 'High' else 20
-            reasons.append(f"Upcoming {event['event']} in {days_until_event} days")
+    in_window = (event_days >= 0) & (event_days <= dte)
+    risk_score += int(EVENT_WEIGHTS[event_codes, in_window.astype(np.int8)].sum())
+    for i in np.flatnonzero(in_window):
+        reasons.append(f"Upcoming {events[i]['event']} in {event_days[i]} days")
     
     # Check distance to support
     if support_levels and len(support_levels) > 0:
-        closest_support = min(support_levels, key=lambda x: abs(x - current_price))
+        supports_arr = np.asarray(support_levels, dtype=np.float64)
+        closest_support = float(supports_arr[np.argmin(np.abs(supports_arr - current_price))])
         support_distance_pct = (current_price - closest_support) / current_price * 100
         
-        if support_distance_pct < 2:
-            risk_score += 30
-            reasons.append(f"Close to support level (${closest_support:.2f})")
-        elif support_distance_pct < 5:
-            risk_score += 15
-            reasons.append(f"Moderately close to support level (${closest_support:.2f})")
+        bucket = int(np.digitize(support_distance_pct, SUPPORT_BINS))
+        risk_score += int(SUPPORT_WEIGHTS[bucket])
+        if SUPPORT_REASONS[bucket]:
+            reasons.append(SUPPORT_REASONS[bucket].format(closest_support))
     
     # Check IV percentile
-    if iv_percentile > 70:
-        risk_score -= 10  # High IV is good for premium sellers
-        reasons.append("High IV percentile good for option selling")
-    elif iv_percentile < 30:
-        risk_score += 10
-        reasons.append("Low IV percentile means less premium")
+    bucket = int(iv_percentile >= 30) + int(iv_percentile > 70)
+    risk_score += int(IV_WEIGHTS[bucket])
+    if IV_REASONS[bucket]:
+        reasons.append(IV_REASONS[bucket])
     
     # Ensure risk score is within bounds
     risk_score = max(0, min(100, risk_score))
@@ -366,48 +552,103 @@ def assess_risk(events, dte, current_price, support_levels, iv_percentile):
     
     return risk_level, risk_score, reasons
 
+# Metrics for a PUT credit spread position
+SpreadMetrics = namedtuple('SpreadMetrics', 'max_loss max_profit collateral roi capital_usage break_even spread_width')
+
 # Function to calculate PUT credit spread metrics
 def calculate_put_spread(current_price, short_strike, long_strike, premium, contracts, capital):
     spread_width = short_strike - long_strike
-    max_loss = (spread_width - premium) * 100 * contracts
-    max_profit = premium * 100 * contracts
-    collateral = spread_width * 100 * contracts
-    roi = (max_profit / collateral) * 100
+    width_x100 = spread_width * 100
+    premium_x100 = premium * 100
+    max_loss = (width_x100 - premium_x100) * contracts
+    max_profit = premium_x100 * contracts
+    collateral = width_x100 * contracts
+    roi = (max_profit / collateral) * 100 if collateral > 0 else 0.0
     capital_usage = (collateral / capital) * 100
     
     # Calculate break-even
     break_even = short_strike - premium
     
-    return {
-        'max_loss': max_loss,
-        'max_profit': max_profit,
-        'collateral': collateral,
-        'roi': roi,
-        'capital_usage': capital_usage,
-        'break_even': break_even,
-        'spread_width': spread_width
-    }
+    return SpreadMetrics(max_loss, max_profit, collateral, roi, capital_usage, break_even, spread_width)
 
 # Function to generate profit/loss curve
 def generate_pl_curve(current_price, short_strike, long_strike, premium, contracts):
-    price_points = np.linspace(long_strike - 5, current_price + 10, 100)
-    pnl_points = []
-    
-    for price in price_points:
-        if price >= short_strike:
-            # Both options expire worthless
-            pnl = premium * 100 * contracts
-        elif price <= long_strike:
-            # Maximum loss
-            pnl = (premium - (short_strike - long_strike)) * 100 * contracts
-        else:
-            # Between long and short strike
-            pnl = (premium - (short_strike - price)) * 100 * contracts
-            
-        pnl_points.append(pnl)
+    # The payoff is piecewise linear with kinks only at the two strikes, so the ends plus the strikes draw it exactly
+    price_points = np.sort(np.array([long_strike - 5, long_strike, short_strike, current_price + 10], dtype=np.float64))
+    width = short_strike - long_strike
+    
+    # Intrinsic value of the spread at expiration: zero above the short strike, capped at the width below the long strike
+    intrinsic = np.clip(short_strike - price_points, 0.0, width)
+    pnl_points = (premium - intrinsic) * 100.0 * contracts
     
     return price_points, pnl_points
 
+# Function to build the P/L chart, cached on its scalar inputs so unrelated reruns reuse it (treat as read-only)
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_pl_figure(current_price, short_strike, long_strike, premium, contracts, break_even):
+    import plotly.graph_objects as go
+    
+    # Generate P/L curve
+    price_points, pnl_points = generate_pl_curve(
+        current_price, short_strike, long_strike, premium, contracts
+    )
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=price_points, y=pnl_points, mode='lines', name='P/L'))
+    fig.add_vline(x=current_price, line_dash="dash", line_color="green", annotation_text="Current Price")
+    fig.add_vline(x=break_even, line_dash="dash", line_color="orange", annotation_text="Break Even")
+    fig.update_layout(xaxis_title="Stock Price at Expiration", yaxis_title="Profit/Loss ($)")
+    return fig
+
+# Function to merge consecutive bars so a long history draws at most max_bars candles
+def downsample_ohlc(df, max_bars=250):
+    if len(df) <= max_bars:
+        return df
+    step = -(-len(df) // max_bars)  # ceil division
+    buckets = np.arange(len(df)) // step
+    agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+    if 'Volume' in df.columns:
+        agg['Volume'] = 'sum'
+    out = df.groupby(buckets).agg(agg)
+    out.index = df.index[::step]
+    return out
+
+# Function to build the candlestick chart with support/resistance lines; it depends only on the history,
+# so it is cached across slider changes (callers copy it before adding the strike lines)
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_price_figure(ticker, last_index, n_rows, supports, resistances, _hist):
+    import plotly.graph_objects as go
+    
+    # Create price chart with support/resistance
+    fig = go.Figure()
+    
+    _hist = downsample_ohlc(_hist)
+    
+    # Add price data as plain NumPy arrays so Plotly skips pandas conversion
+    # (drop the timezone first, otherwise the index converts to an object array of Timestamps)
+    fig.add_trace(go.Candlestick(
+        x=_hist.index.tz_localize(None).to_numpy(),
+        open=_hist['Open'].to_numpy(),
+        high=_hist['High'].to_numpy(),
+        low=_hist['Low'].to_numpy(),
+        close=_hist['Close'].to_numpy(),
+        name=ticker
+    ))
+    
+    # Add support/resistance lines
+    for i, level in enumerate(supports):
+        fig.add_hline(y=level, line_dash="dash", line_color="green", 
+                     annotation_text=f"S{i+1}", annotation_position="right",
+                     annotation_font_color="green")
+    
+    for i, level in enumerate(resistances):
+        fig.add_hline(y=level, line_dash="dash", line_color="red", 
+                     annotation_text=f"R{i+1}", annotation_position="right",
+                     annotation_font_color="red")
+    
+    fig.update_layout(height=400, showlegend=False, xaxis_rangeslider_visible=False)
+    return fig
+
 # Function to display financial metrics
 def display_financial_metrics(ticker):
     try:
@@ -437,32 +678,94 @@ def display_financial_metrics(ticker):
     except:
         pass
 
-# Main app logic
-def main():
-    # Load data
-    hist, info = get_stock_data(ticker)
+# Fragment for everything that depends on DTE, so moving the slider reruns only this section
+@st.fragment
+def render_risk(today, current_price, events, event_days, event_codes, supports, iv_percentile):
+    st.markdown(f'<p class="section-header">Timing & Risk</p>', unsafe_allow_html=True)
+    dte = st.slider("Days to Expiration (DTE)", min_value=5, max_value=45, value=14, key='dte')
     
-    # If we couldn't load data, show error and return
-    if hist is None:
-        st.error(f"Could not load data for ticker {ticker}. Please check the ticker symbol and try again.")
-        st.info("Popular tickers: SPY (S&P 500), AAPL (Apple), MSFT (Microsoft), GOOGL (Google), AMZN (Amazon), NVDA (NVIDIA)")
-        st.info("Note: Some international tickers may not be supported.")
-        return
+    # Assess risk
+    risk_level, risk_score, risk_reasons = assess_risk(
+        events, event_days, event_codes, dte, current_price, supports, iv_percentile
+    )
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        # Display risk assessment
+        st.markdown(f'<p class="section-header">Risk Assessment</p>', unsafe_allow_html=True)
+        if risk_level == "High":
+            st.markdown(f'<div class="risk-high"><h3>High Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
+        elif risk_level == "Medium":
+            st.markdown(f'<div class="risk-medium"><h3>Medium Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<div class="risk-low"><h3>Low Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
         
-    current_price = hist['Close'].iloc[-1] if not hist.empty else 0
+        if risk_reasons:
+            st.markdown("\n".join(f"- {reason}" for reason in risk_reasons).replace("$", "\\$"))
     
-    # Get company profile
-    profile = get_company_profile(ticker)
+    with col2:
+        st.markdown(f'<p class="section-header">Upcoming Catalysts</p>', unsafe_allow_html=True)
+        
+        st.write(f"**Expiration:** {(today + timedelta(days=dte)).strftime('%b %d, %Y')}")
+        # Build the whole list as one HTML blob so it goes out as a single element
+        html_parts = []
+        for event, days_away in zip(events, event_days):
+            if 0 <= days_away <= dte:
+                icon = "🔴" if event['importance'] == 'High' else "🟡"
+                html_parts.append(
+                    f"<div>{icon} <b>{event['date'].strftime('%b %d, %Y')}</b> ({days_away} days)<br>"
+                    f"{escape(event['event'])} - <i>{event['importance']} Impact</i></div><hr>"
+                )
+        if html_parts:
+            st.markdown("".join(html_parts), unsafe_allow_html=True)
     
-    events = get_upcoming_events(ticker)
-    news = get_news(ticker)
-    levels = calculate_support_resistance(hist)
-    iv_percentile = calculate_iv_percentile(ticker)
+    # Strategy recommendation
+    st.markdown(f'<p class="section-header">Trading Recommendation</p>', unsafe_allow_html=True)
     
-    # Assess risk
-    risk_level, risk_score, risk_reasons = assess_risk(
-        events, dte, current_price, levels['support'], iv_percentile
-    )
+    if risk_level == "High":
+        st.error("""
+        **Not Recommended** - High risk detected due to:
+        - Upcoming catalysts that may increase volatility
+        - Price near key support levels
+        - Consider waiting until after events or choosing a different underlying
+        
+        If you still want to proceed:
+        - Reduce position size by 50%
+        - Use a wider spread for more protection
+        - Set tighter stop-losses
+        """)
+    elif risk_level == "Medium":
+        st.warning("""
+        **Caution Advised** - Moderate risk detected:
+        - Consider smaller position sizes
+        - Choose wider spreads for more room
+        - Closely monitor positions
+        - Consider shorter DTE to avoid upcoming events
+        """)
+    else:
+        st.success("""
+        **Favorable Conditions** - Lower risk environment:
+        - No major catalysts in the selected DTE period
+        - Adequate distance from key support levels
+        - Standard position sizing appropriate
+        """)
+
+# Fragment for the strike/sizing sliders and everything derived from them, so moving one reruns only this section
+@st.fragment
+def render_spread_ui(ticker, hist, current_price, levels):
+    import plotly.graph_objects as go
+    
+    st.markdown(f'<p class="section-header">Strategy Parameters</p>', unsafe_allow_html=True)
+    pcol1, pcol2, pcol3, pcol4 = st.columns(4)
+    with pcol1:
+        capital = st.number_input("Capital Allocated ($)", min_value=100, value=1000, step=100)
+    with pcol2:
+        max_risk_pct = st.slider("Max Risk % per Trade", min_value=1, max_value=10, value=3)
+    with pcol3:
+        strike_distance = st.slider("Short Strike Distance (%)", min_value=1, max_value=10, value=5)
+    with pcol4:
+        spread_width = st.slider("Spread Width (%)", min_value=1, max_value=10, value=5)
     
     # Calculate suggested strike prices
     short_strike = round(current_price * (1 - strike_distance/100), 2)
@@ -475,6 +778,10 @@ def main():
     max_risk_amount = capital * (max_risk_pct / 100)
     spread_width_dollar = short_strike - long_strike
     max_loss_per_contract = (spread_width_dollar - premium) * 100
+    # Strikes can round together on a very low-priced stock, leaving nothing to size or price
+    if spread_width_dollar <= 0 or max_loss_per_contract <= 0:
+        st.warning(f"The short and long strikes collapsed to \\${short_strike:.2f} for {ticker}. Widen the spread or strike distance to build a trade.")
+        return
     contracts = max(1, int(max_risk_amount / max_loss_per_contract))
     
     # Calculate spread metrics
@@ -482,78 +789,19 @@ def main():
         current_price, short_strike, long_strike, premium, contracts, capital
     )
     
-    # Generate P/L curve
-    price_points, pnl_points = generate_pl_curve(
-        current_price, short_strike, long_strike, premium, contracts
-    )
-    
-    # Layout
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
-        st.markdown(f'<p class="section-header">{ticker} Overview</p>', unsafe_allow_html=True)
-        
-        # Display company profile
-        if profile and 'name' in profile:
-            st.write(f"**Company:** {profile['name']}")
-        if profile and 'sector' in profile and profile['sector'] != 'N/A':
-            st.write(f"**Sector:** {profile['sector']}")
-        if profile and 'industry' in profile and profile['industry'] != 'N/A':
-            st.write(f"**Industry:** {profile['industry']}")
-        
-        st.metric("Current Price", f"${current_price:.2f}")
-        st.metric("IV Percentile", f"{iv_percentile}%")
-        
-        # Display financial metrics
-        display_financial_metrics(ticker)
-        
-        # Display risk assessment
-        st.markdown(f'<p class="section-header">Risk Assessment</p>', unsafe_allow_html=True)
-        if risk_level == "High":
-            st.markdown(f'<div class="risk-high"><h3>High Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
-        elif risk_level == "Medium":
-            st.markdown(f'<div class="risk-medium"><h3>Medium Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="risk-low"><h3>Low Risk</h3><p>Score: {risk_score}/100</p></div>', unsafe_allow_html=True)
-        
-        for reason in risk_reasons:
-            st.write(f"- {reason}")
-            
-        # Display key levels
-        st.markdown(f'<p class="section-header">Key Levels</p>', unsafe_allow_html=True)
-        st.write(f"**Pivot Point:** ${levels['pivot']:.2f}")
-        st.write(f"**Support 1:** ${levels['support'][0]:.2f}")
-        st.write(f"**Support 2:** ${levels['support'][1]:.2f}")
-        st.write(f"**Resistance 1:** ${levels['resistance'][0]:.2f}")
-        st.write(f"**Resistance 2:** ${levels['resistance'][1]:.2f}")
-    
-    with col2:
         st.markdown(f'<p class="section-header">Price Chart & Levels</p>', unsafe_allow_html=True)
         
-        # Create price chart with support/resistance
-        fig = go.Figure()
-        
-        # Add price data
-        fig.add_trace(go.Candlestick(
-            x=hist.index,
-            open=hist['Open'],
-            high=hist['High'],
-            low=hist['Low'],
-            close=hist['Close'],
-            name=ticker
+        # Copy the cached candlestick figure and add the strike lines, which change with the sliders
+        fig = go.Figure(build_price_figure(
+            ticker, hist.index[-1], len(hist),
+            (levels.s1, levels.s2),
+            (levels.r1, levels.r2),
+            hist
         ))
         
-        # Add support/resistance lines
-        for i, level in enumerate(levels['support']):
-            fig.add_hline(y=level, line_dash="dash", line_color="green", 
-                         annotation_text=f"S{i+1}", annotation_position="right",
-                         annotation_font_color="green")
-        
-        for i, level in enumerate(levels['resistance']):
-            fig.add_hline(y=level, line_dash="dash", line_color="red", 
-                         annotation_text=f"R{i+1}", annotation_position="right",
-                         annotation_font_color="red")
-        
         # Add suggested strike prices
         fig.add_hline(y=short_strike, line_dash="dot", line_color="blue", 
                      annotation_text="Short Put", annotation_position="right",
@@ -563,90 +811,132 @@ def main():
                      annotation_text="Long Put", annotation_position="right",
                      annotation_font_color="purple")
         
-        fig.update_layout(height=400, showlegend=False, xaxis_rangeslider_visible=False)
         st.plotly_chart(fig, use_container_width=True)
-        
+    
+    with col2:
         # P/L Curve
         st.markdown(f'<p class="section-header">Profit/Loss Curve</p>', unsafe_allow_html=True)
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(x=price_points, y=pnl_points, mode='lines', name='P/L'))
-        fig2.add_vline(x=current_price, line_dash="dash", line_color="green", annotation_text="Current Price")
-        fig2.add_vline(x=spread_metrics['break_even'], line_dash="dash", line_color="orange", annotation_text="Break Even")
-        fig2.update_layout(xaxis_title="Stock Price at Expiration", yaxis_title="Profit/Loss ($)")
+        fig2 = build_pl_figure(current_price, short_strike, long_strike, premium, contracts, spread_metrics.break_even)
         st.plotly_chart(fig2, use_container_width=True)
     
     with col3:
         st.markdown(f'<p class="section-header">PUT Credit Spread Details</p>', unsafe_allow_html=True)
         
         st.markdown(f'<div class="put-spread">', unsafe_allow_html=True)
-        st.write(f"**Short Put Strike:** ${short_strike:.2f}")
-        st.write(f"**Long Put Strike:** ${long_strike:.2f}")
-        st.write(f"**Premium Received:** ${premium:.2f} per share")
-        st.write(f"**Contracts:** {contracts}")
-        st.write(f"**Expiration:** {(datetime.date.today() + timedelta(days=dte)).strftime('%b %d, %Y')}")
+        st.markdown(
+            f"**Short Put Strike:** \\${short_strike:.2f}\n\n"
+            f"**Long Put Strike:** \\${long_strike:.2f}\n\n"
+            f"**Premium Received:** \\${premium:.2f} per share\n\n"
+            f"**Contracts:** {contracts}"
+        )
         st.markdown('</div>', unsafe_allow_html=True)
         
         st.markdown(f'<p class="section-header">Trade Metrics</p>', unsafe_allow_html=True)
-        st.write(f"**Max Profit:** ${spread_metrics['max_profit']:.2f}")
-        st.write(f"**Max Loss:** ${spread_metrics['max_loss']:.2f}")
-        st.write(f"**Break-even Price:** ${spread_metrics['break_even']:.2f}")
-        st.write(f"**Return on Risk:** {spread_metrics['roi']:.1f}%")
-        st.write(f"**Capital Required:** ${spread_metrics['collateral']:.2f}")
-        st.write(f"**Capital Usage:** {spread_metrics['capital_usage']:.1f}%")
+        st.markdown(
+            f"**Max Profit:** \\${spread_metrics.max_profit:.2f}\n\n"
+            f"**Max Loss:** \\${spread_metrics.max_loss:.2f}\n\n"
+            f"**Break-even Price:** \\${spread_metrics.break_even:.2f}\n\n"
+            f"**Return on Risk:** {spread_metrics.roi:.1f}%\n\n"
+            f"**Capital Required:** \\${spread_metrics.collateral:.2f}\n\n"
+            f"**Capital Usage:** {spread_metrics.capital_usage:.1f}%"
+        )
+
+# Main app logic
+def main():
+    # Drop cached data (handled here because the cached functions are defined below the sidebar);
+    # the disk cache handle and HTTP session stay open
+    if clear_cache:
+        cache.clear()
+        st.session_state.pop(SESSION_CACHE_KEY, None)
+        st.cache_data.clear()
+        for cached_fn in (load_ticker_bundle, get_stock_data, get_bulk_history, get_options_chain,
+                          build_price_figure, build_pl_figure):
+            cached_fn.clear()
+    
+    # Resolve today's date once per run and pass it to the helpers and fragments
+    today = datetime.date.today()
+    
+    # Fetch all Yahoo endpoints for the ticker concurrently; the helpers below read from this cached bundle
+    load_ticker_bundle(ticker, HISTORY_PERIOD)
+    
+    # Load data
+    hist = get_stock_data(ticker)
+    
+    # If we couldn't load data, show error and return
+    if hist is None:
+        st.error(f"Could not load data for ticker {ticker}. Please check the ticker symbol and try again.")
+        st.info("Popular tickers: SPY (S&P 500), AAPL (Apple), MSFT (Microsoft), GOOGL (Google), AMZN (Amazon), NVDA (NVIDIA)")
+        st.info("Note: Some international tickers may not be supported.")
+        return
         
-        st.markdown(f'<p class="section-header">Upcoming Catalysts</p>', unsafe_allow_html=True)
+    current_price = float(hist['Close'].iat[-1]) if not hist.empty else 0
+    
+    # Get company profile
+    profile = get_company_profile(ticker)
+    
+    events, event_days, event_codes = get_upcoming_events(ticker, today)
+    
+    news = get_news(ticker)
+    levels = calculate_support_resistance(hist)
+    iv_percentile = calculate_iv_percentile(ticker)
+    
+    # Plotly is only imported once there is a chart to draw; orjson speeds up figure serialization
+    import plotly.io as pio
+    pio.json.config.default_engine = 'orjson'
+    
+    # Layout
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown(f'<p class="section-header">{ticker} Overview</p>', unsafe_allow_html=True)
+        ocol1, ocol2 = st.columns([1, 1])
         
-        today = datetime.date.today()
-        for event in events:
-            days_away = (event['date'] - today).days
-            if 0 <= days_away <= dte:
-                icon = "🔴" if event['importance'] == 'High' else "🟡"
-                st.write(f"{icon} **{event['date'].strftime('%b %d, %Y')}** ({days_away} days)")
-                st.write(f"{event['event']} - *{event['importance']} Impact*")
-                st.markdown("---")
+        with ocol1:
+            # Display company profile (one markdown block; paragraphs are separated by blank lines)
+            profile_lines = []
+            if profile and 'name' in profile:
+                profile_lines.append(f"**Company:** {profile['name']}")
+            if profile and 'sector' in profile and profile['sector'] != 'N/A':
+                profile_lines.append(f"**Sector:** {profile['sector']}")
+            if profile and 'industry' in profile and profile['industry'] != 'N/A':
+                profile_lines.append(f"**Industry:** {profile['industry']}")
+            if profile_lines:
+                st.markdown("\n\n".join(profile_lines))
+            
+            st.metric("Current Price", f"${current_price:.2f}")
+            st.metric("IV Percentile", f"{iv_percentile}%")
         
+        with ocol2:
+            # Display key levels
+            st.markdown(f'<p class="section-header">Key Levels</p>', unsafe_allow_html=True)
+            st.markdown(
+                f"**Pivot Point:** \\${levels.pivot:.2f}\n\n"
+                f"**Support 1:** \\${levels.s1:.2f}\n\n"
+                f"**Support 2:** \\${levels.s2:.2f}\n\n"
+                f"**Resistance 1:** \\${levels.r1:.2f}\n\n"
+                f"**Resistance 2:** \\${levels.r2:.2f}"
+            )
+        
+        # Display financial metrics
+        display_financial_metrics(ticker)
+    
+    with col2:
         st.markdown(f'<p class="section-header">Recent News</p>', unsafe_allow_html=True)
+        html_parts = []
         for item in news:
-            # Extract title and publisher
-            title = item.get('title', 'No title')
-            publisher = item.get('publisher', 'Unknown')
-            url = item.get('url', '#')
+            # Extract title and publisher (scraped text, so escape it before rendering as HTML)
+            title = escape(item.get('title', 'No title'))
+            publisher = escape(item.get('publisher', 'Unknown'))
             
             # Display news item
-            st.write(f"**{title}**")
-            st.caption(f"Source: {publisher}")
-            st.markdown("---")
+            html_parts.append(f"<div><b>{title}</b><br><small>Source: {publisher}</small></div><hr>")
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
     
-    # Strategy recommendation
-    st.markdown(f'<p class="section-header">Trading Recommendation</p>', unsafe_allow_html=True)
+    # Strike/sizing section (reruns on its own when the strategy sliders move)
+    render_spread_ui(ticker, hist, current_price, levels)
     
-    if risk_level == "High":
-        st.error("""
-        **Not Recommended** - High risk detected due to:
-        - Upcoming catalysts that may increase volatility
-        - Price near key support levels
-        - Consider waiting until after events or choosing a different underlying
-        
-        If you still want to proceed:
-        - Reduce position size by 50%
-        - Use a wider spread for more protection
-        - Set tighter stop-losses
-        """)
-    elif risk_level == "Medium":
-        st.warning("""
-        **Caution Advised** - Moderate risk detected:
-        - Consider smaller position sizes
-        - Choose wider spreads for more room
-        - Closely monitor positions
-        - Consider shorter DTE to avoid upcoming events
-        """)
-    else:
-        st.success("""
-        **Favorable Conditions** - Lower risk environment:
-        - No major catalysts in the selected DTE period
-        - Adequate distance from key support levels
-        - Standard position sizing appropriate
-        """)
+    # DTE-dependent risk section (reruns on its own when the DTE slider moves)
+    render_risk(today, current_price, events, event_days, event_codes, (levels.s1, levels.s2), iv_percentile)
     
     # Trade management guidelines
     st.markdown(f'<p class="section-header">Trade Management</p>', unsafe_allow_html=True)
@@ -657,6 +947,15 @@ def main():
     - **Adjustment:** Roll down and out if challenged but thesis remains
     - **Exit:** Close before earnings or major events if possible
     """)
+    
+    # Watchlist scan
+    if watchlist_tickers:
+        st.markdown(f'<p class="section-header">Watchlist Scan</p>', unsafe_allow_html=True)
+        scan = scan_watchlist(watchlist_tickers)
+        if scan is None or scan.empty:
+            st.warning("Could not load watchlist data.")
+        else:
+            st.dataframe(scan.style.format("{:.2f}"), use_container_width=True)
 
 # Run the app
 if __name__ == "__main__":